@@ -2,11 +2,51 @@
 import os
 import logging
 import json
+import math
 import time
-from datetime import datetime, timedelta
+import atexit
+import tempfile
+import threading
+from array import array
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import requests
-import schedule
-import pytz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class RateLimitingFilter(logging.Filter):
+    """Drop repeated warnings and errors within a time window, so outages don't flood the logs"""
+    def __init__(self, window=60, level=logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.level = level
+        self._last_seen = {}
+        self._last_sweep = time.monotonic()
+        # The optimizer logs from its I/O worker threads as well as the main thread
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+        
+        # Key on the unformatted message prefix so lazy arguments are never rendered
+        key = (record.name, record.levelno, str(record.msg)[:80])
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_seen.get(key)
+            if last is not None and now - last < self.window:
+                return False
+            
+            # Evict expired entries so messages with changing values don't accumulate forever,
+            # sweeping at most once per window to keep the per-record cost constant
+            if now - self._last_sweep >= self.window:
+                self._last_seen = {k: seen for k, seen in self._last_seen.items() if now - seen < self.window}
+                self._last_sweep = now
+            self._last_seen[key] = now
+        return True
+
 
 # Configure logging
 logging.basicConfig(
@@ -15,62 +55,196 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 logger = logging.getLogger('givenergy-optimizer')
+logger.addFilter(RateLimitingFilter(window=60))
 
-# Configuration from environment variables
-GIVENERGY_API_KEY = os.environ.get('GIVENERGY_API_KEY')
-GIVENERGY_SYSTEM_ID = os.environ.get('GIVENERGY_SYSTEM_ID')  # Communication device ID (e.g., WO2227G735)
-WEATHER_API_KEY = os.environ.get('WEATHER_API_KEY')
-LOCATION_LAT = os.environ.get('LOCATION_LAT')
-LOCATION_LON = os.environ.get('LOCATION_LON')
-TIMEZONE = os.environ.get('TIMEZONE', 'Europe/London')
-MIN_BATTERY_LEVEL = float(os.environ.get('MIN_BATTERY_LEVEL', '20.0'))
-CHARGE_THRESHOLD = float(os.environ.get('CHARGE_THRESHOLD', '3.0'))
+# Environment variable behind each required configuration value
+REQUIRED_ENV_VARS = {
+    'givenergy_api_key': 'GIVENERGY_API_KEY',
+    'system_id': 'GIVENERGY_SYSTEM_ID',
+    'weather_api_key': 'WEATHER_API_KEY',
+    'location_lat': 'LOCATION_LAT',
+    'location_lon': 'LOCATION_LON',
+}
+
+# Daily check schedule (local time in the configured timezone)
+DAILY_CHECK_HOUR = 17
+DAILY_CHECK_MINUTE = 0
+MAX_SLEEP_SECONDS = 3600  # Wake up at least hourly so clock changes are picked up promptly
+
+# Number of 3-hour forecast intervals covering the next 24 hours
+FORECAST_SLOTS = 8
+FORECAST_SLOT_HOURS = 3
 
 # GivEnergy API endpoints
 GIVENERGY_BASE_URL = 'https://api.givenergy.cloud/v1'
 
-class GivEnergyWeatherOptimizer:
-    def __init__(self):
-        self.timezone = pytz.timezone(TIMEZONE)
-        self.validate_config()
-        self.inverter_serial = None
-        self.get_inverter_serial()
-        logger.info(f"GivEnergy Weather Optimizer initialized with inverter serial: {self.inverter_serial}")
+# Overnight charge window (typically during off-peak hours), in HH:MM format
+CHARGE_START = "01:30"
+CHARGE_END = "05:30"
 
-    def validate_config(self):
+# Timed-charge preset payloads, built once according to the API spec format
+CHARGE_PAYLOAD = {
+    "enabled": True,
+    "slots": [
+        {
+            "start_time": CHARGE_START,
+            "end_time": CHARGE_END,
+            "percent_limit": 100  # Target battery percentage
+        }
+    ]
+}
+# Note: API requires at least one slot, even when disabled
+CANCEL_PAYLOAD = {
+    "enabled": False,
+    "slots": [
+        {
+            "start_time": "00:00",
+            "end_time": "00:00",
+            "percent_limit": 100
+        }
+    ]
+}
+# Request bodies serialized once, so posting a preset does no JSON encoding
+CHARGE_PAYLOAD_JSON = json.dumps(CHARGE_PAYLOAD)
+CANCEL_PAYLOAD_JSON = json.dumps(CANCEL_PAYLOAD)
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Optimizer configuration, parsed and validated once from environment variables"""
+    givenergy_api_key: str = field(repr=False)  # Keep secrets out of logs
+    system_id: str  # Communication device ID (e.g., WO2227G735)
+    weather_api_key: str = field(repr=False)
+    location_lat: float
+    location_lon: float
+    timezone: str = 'Europe/London'
+    min_battery_level: float = 20.0
+    charge_threshold: float = 3.0
+    pv_peak_kw: float = 3.0  # Array peak power (kWp), reached in clear sky with the sun overhead
+
+    def __post_init__(self):
         """Validate that all required configuration is present"""
-        missing_vars = []
-        for var in ['GIVENERGY_API_KEY', 'GIVENERGY_SYSTEM_ID', 'WEATHER_API_KEY', 'LOCATION_LAT', 'LOCATION_LON']:
-            if not globals().get(var):
-                missing_vars.append(var)
-        
+        missing_vars = [env_var for field_name, env_var in REQUIRED_ENV_VARS.items()
+                        if getattr(self, field_name) in (None, '')]
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
-    def get_givenergy_headers(self):
-        """Get the headers required for GivEnergy API calls"""
-        return {
-            'Authorization': f'Bearer {GIVENERGY_API_KEY}',
+    @classmethod
+    def from_env(cls):
+        """Build the configuration from environment variables"""
+        lat = os.environ.get('LOCATION_LAT')
+        lon = os.environ.get('LOCATION_LON')
+        return cls(
+            givenergy_api_key=os.environ.get('GIVENERGY_API_KEY'),
+            system_id=os.environ.get('GIVENERGY_SYSTEM_ID'),
+            weather_api_key=os.environ.get('WEATHER_API_KEY'),
+            location_lat=float(lat) if lat else None,
+            location_lon=float(lon) if lon else None,
+            timezone=os.environ.get('TIMEZONE', 'Europe/London'),
+            min_battery_level=float(os.environ.get('MIN_BATTERY_LEVEL', '20.0')),
+            charge_threshold=float(os.environ.get('CHARGE_THRESHOLD', '3.0')),
+            pv_peak_kw=float(os.environ.get('PV_PEAK_KW', '3.0')),
+        )
+
+
+def solar_elevation_factor(lat, lon, dt):
+    """Cosine of the solar zenith angle at a location and time (0 when the sun is down)"""
+    # NOAA general solar position equations, accurate to well within a degree
+    utc = dt.astimezone(timezone.utc)
+    hour = utc.hour + utc.minute / 60
+    gamma = 2 * math.pi / 365 * (utc.timetuple().tm_yday - 1 + (hour - 12) / 24)
+    
+    # Equation of time (minutes) and solar declination (radians)
+    eqtime = 229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                       - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma))
+    decl = (0.006918 - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma)
+            - 0.006758 * math.cos(2 * gamma) + 0.000907 * math.sin(2 * gamma)
+            - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma))
+    
+    true_solar_minutes = hour * 60 + eqtime + 4 * lon
+    hour_angle = math.radians(true_solar_minutes / 4 - 180)
+    lat_rad = math.radians(lat)
+    cos_zenith = (math.sin(lat_rad) * math.sin(decl)
+                  + math.cos(lat_rad) * math.cos(decl) * math.cos(hour_angle))
+    return max(0.0, cos_zenith)
+
+
+class LazyJSON:
+    """Log argument that defers JSON serialization until the record is actually emitted"""
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data)
+
+
+class GivEnergyWeatherOptimizer:
+    def __init__(self, cfg=None):
+        self.cfg = cfg or Config.from_env()
+        self.timezone = ZoneInfo(self.cfg.timezone)
+        self.http_timeout = (5, 15)  # (connect, read) seconds, so a stalled connection can't hang the service
+        # Headers required for GivEnergy API calls, built once and owned by the session
+        self._headers = {
+            'Authorization': f'Bearer {self.cfg.givenergy_api_key}',
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         }
-    
+        self.session = self.create_session()
+        self.session.headers.update(self._headers)
+        # Separate session so the GivEnergy bearer token is never sent to OpenWeather
+        self.weather_session = self.create_session()
+        # Long-lived worker pool for overlapping independent API calls
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='givenergy-io')
+        atexit.register(self.close)
+        # OpenWeather only refreshes forecasts every ~10 minutes, so cache them on disk
+        self._wx_cache_path = '/tmp/givenergy_wx.json'
+        self._wx_ttl = 600
+        # ETag/Last-Modified validators for conditional GETs, keyed by resource
+        self._http_cache_path = '/tmp/givenergy_http.json'
+        self._http_cache = self.read_json_file(self._http_cache_path) or {}
+        self._http_cache_lock = threading.Lock()
+        self.inverter_serial = None
+        self._url_preset = None
+        self._battery_urls = {}  # Latest system data endpoint per inverter serial
+        self.get_inverter_serial()
+        # Last timed-charge preset applied, so unchanged presets aren't re-sent every run
+        self._last_preset = self.load_last_preset()
+        logger.info(f"GivEnergy Weather Optimizer initialized with inverter serial: {self.inverter_serial}")
+
+    def create_session(self):
+        """Create a pooled HTTP session that keeps connections alive and retries transient errors"""
+        session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """Close the HTTP sessions and worker pool, releasing pooled connections"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+        self.weather_session.close()
+
     def get_inverter_serial(self):
         """Get the inverter serial number from the communication device information"""
         try:
             # Based on API spec, this is the endpoint to get communication device info
-            url = f"{GIVENERGY_BASE_URL}/communication-device/{GIVENERGY_SYSTEM_ID}"
+            url = f"{GIVENERGY_BASE_URL}/communication-device/{self.cfg.system_id}"
             logger.info(f"Getting inverter serial from: {url}")
             
-            response = requests.get(url, headers=self.get_givenergy_headers())
+            response = self.session.get(url, timeout=self.http_timeout)
             if response.status_code == 200:
                 data = response.json()
                 
                 if 'data' in data and 'inverter' in data['data'] and 'serial' in data['data']['inverter']:
                     self.inverter_serial = data['data']['inverter']['serial']
+                    # Build the per-inverter endpoints once, per the API spec
+                    self._url_preset = f"{GIVENERGY_BASE_URL}/inverter/{self.inverter_serial}/presets/timed-charge"
+                    self.battery_url(self.inverter_serial)
                     logger.info(f"Found inverter serial: {self.inverter_serial}")
                 else:
-                    logger.error(f"Could not find inverter serial in response: {json.dumps(data)}")
+                    logger.error("Could not find inverter serial in response")
+                    logger.debug("Communication device response: %s", LazyJSON(data))
                     raise ValueError("Inverter serial not found in API response")
             else:
                 logger.error(f"Error getting communication device info: {response.status_code} - {response.text}")
@@ -85,67 +259,99 @@ class GivEnergyWeatherOptimizer:
         if not self.inverter_serial:
             logger.error("Cannot get battery status without inverter serial")
             return None
-            
-        try:
+        
+        return self.get_battery_statuses([self.inverter_serial])[self.inverter_serial]
+
+    def get_battery_statuses(self, serials):
+        """Get the current battery status of several inverters, fetched concurrently"""
+        urls = [self.battery_url(serial) for serial in serials]
+        logger.info(f"Getting battery status from: {', '.join(urls)}")
+        
+        statuses = {}
+        for serial, body in zip(serials, self._batch_get(urls)):
+            if body is None:
+                statuses[serial] = None
+                continue
+            try:
+                statuses[serial] = self.parse_battery_status(serial, body)
+            except Exception as e:
+                logger.error(f"Error getting battery status for inverter {serial}: {e}")
+                statuses[serial] = None
+        return statuses
+
+    def battery_url(self, serial):
+        """Get the latest system data endpoint for an inverter, built once per serial"""
+        url = self._battery_urls.get(serial)
+        if url is None:
             # Based on API spec, this is the endpoint to get latest system data
-            url = f"{GIVENERGY_BASE_URL}/inverter/{self.inverter_serial}/system-data/latest"
-            logger.info(f"Getting battery status from: {url}")
-            
-            response = requests.get(url, headers=self.get_givenergy_headers())
-            if response.status_code == 200:
-                data = response.json().get('data', {})
-                
-                # Extract battery information according to the API spec format
-                if 'battery' in data and 'percent' in data['battery']:
-                    battery_level = data['battery']['percent']
-                    battery_power = data['battery'].get('power', 0)
-                    solar_power = data.get('solar', {}).get('power', 0)
-                    
-                    logger.info(f"Current battery level: {battery_level}%")
-                    return {
-                        'battery_level': battery_level,
-                        'battery_power': battery_power,
-                        'solar_power': solar_power,
-                        'timestamp': data.get('time')
-                    }
-                else:
-                    logger.error(f"Could not find battery data in response: {json.dumps(data)}")
-            else:
-                logger.error(f"Error getting battery status: {response.status_code} - {response.text}")
+            url = self._battery_urls[serial] = f"{GIVENERGY_BASE_URL}/inverter/{serial}/system-data/latest"
+        return url
+
+    def parse_battery_status(self, serial, body):
+        """Extract battery information from a latest system data response"""
+        data = body.get('data', {})
+        
+        # Extract battery information according to the API spec format
+        if 'battery' in data and 'percent' in data['battery']:
+            battery_level = data['battery']['percent']
+            battery_power = data['battery'].get('power', 0)
+            solar_power = data.get('solar', {}).get('power', 0)
             
-            return None
-        except Exception as e:
-            logger.error(f"Error getting battery status: {e}")
-            return None
+            logger.info(f"Current battery level: {battery_level}%")
+            return {
+                'battery_level': battery_level,
+                'battery_power': battery_power,
+                'solar_power': solar_power,
+                'timestamp': data.get('time')
+            }
+        
+        # Serial goes in the message itself so rate limiting treats each inverter separately
+        logger.error(f"Could not find battery data in response for inverter {serial}")
+        logger.debug("Latest system data response for inverter %s: %s", serial, LazyJSON(data))
+        return None
+
+    def _batch_get(self, urls):
+        """GET several GivEnergy resources concurrently over the pooled session, in order"""
+        # Only the caller blocks on these futures, so the shared pool can't deadlock even
+        # when this runs on one of its own workers
+        futures = [self._executor.submit(self.conditional_get, self.session, url) for url in urls]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Error getting {url}: {e}")
+                results.append(None)
+        return results
 
     def get_weather_forecast(self):
         """Get weather forecast for the next 24 hours"""
         try:
-            params = {
-                'lat': LOCATION_LAT,
-                'lon': LOCATION_LON,
-                'appid': WEATHER_API_KEY,
-                'units': 'metric'  # Use metric units
-            }
-            response = requests.get('https://api.openweathermap.org/data/2.5/forecast', params=params)
-            response.raise_for_status()
-            forecast_data = response.json()
+            forecast_data = self.load_cached_forecast()
+            if forecast_data is not None:
+                logger.info("Using cached weather forecast")
+            else:
+                params = {
+                    'lat': self.cfg.location_lat,
+                    'lon': self.cfg.location_lon,
+                    'appid': self.cfg.weather_api_key,
+                    'units': 'metric',  # Use metric units
+                    'cnt': FORECAST_SLOTS  # Only ask for the intervals we use
+                }
+                forecast_data = self.conditional_get(
+                    self.weather_session, 'https://api.openweathermap.org/data/2.5/forecast', params=params
+                )
+                self.save_cached_forecast(forecast_data)
             
-            # Process forecast data to extract useful information
-            processed_forecast = []
-            for item in forecast_data.get('list', [])[:8]:  # Get next 24 hours (3-hour intervals)
-                dt = datetime.fromtimestamp(item['dt'], self.timezone)
-                clouds = item['clouds']['all']  # Cloud coverage in percentage
-                weather_main = item['weather'][0]['main']
-                weather_desc = item['weather'][0]['description']
-                
-                processed_forecast.append({
-                    'datetime': dt.strftime('%Y-%m-%d %H:%M:%S'),
-                    'clouds': clouds,
-                    'weather': weather_main,
-                    'description': weather_desc,
-                    'temperature': item['main']['temp'],
-                })
+            # Process forecast data into one column per field, numeric fields as packed arrays
+            items = forecast_data.get('list', [])[:FORECAST_SLOTS]  # Get next 24 hours (3-hour intervals)
+            processed_forecast = {
+                'dt': [datetime.fromtimestamp(item['dt'], self.timezone) for item in items],
+                'clouds': array('d', [item['clouds']['all'] for item in items]),  # Cloud coverage in percentage
+                'weather': [item['weather'][0]['main'] for item in items],
+                'description': [item['weather'][0]['description'] for item in items],
+                'temperature': array('d', [item['main']['temp'] for item in items]),
+            }
             
             logger.info(f"Weather forecast retrieved for next 24 hours")
             return processed_forecast
@@ -153,60 +359,141 @@ class GivEnergyWeatherOptimizer:
             logger.error(f"Error getting weather forecast: {e}")
             return None
 
+    def load_cached_forecast(self):
+        """Load the raw weather forecast from the disk cache if it is still fresh"""
+        cache = self.read_json_file(self._wx_cache_path)
+        if not cache:
+            return None
+        
+        if cache.get('location') != [self.cfg.location_lat, self.cfg.location_lon]:
+            return None
+        if time.time() - cache.get('ts', 0) > self._wx_ttl:
+            return None
+        return cache.get('data')
+
+    def save_cached_forecast(self, forecast_data):
+        """Atomically write the raw weather forecast to the disk cache"""
+        cache = self.read_json_file(self._wx_cache_path) or {}
+        cache.update({'ts': time.time(), 'location': [self.cfg.location_lat, self.cfg.location_lon], 'data': forecast_data})
+        self.write_json_file(self._wx_cache_path, cache)
+
+    def load_last_preset(self):
+        """Load the last timed-charge preset applied to this inverter from the disk cache"""
+        cache = self.read_json_file(self._wx_cache_path) or {}
+        last_preset = cache.get('last_preset') or {}
+        if last_preset.get('inverter') != self.inverter_serial or not last_preset.get('preset'):
+            return None
+        return tuple(last_preset['preset'])
+
+    def save_last_preset(self, preset):
+        """Record the timed-charge preset applied to this inverter in the disk cache"""
+        self._last_preset = preset
+        cache = self.read_json_file(self._wx_cache_path) or {}
+        cache['last_preset'] = {'inverter': self.inverter_serial, 'preset': list(preset)}
+        self.write_json_file(self._wx_cache_path, cache)
+
+    def conditional_get(self, session, url, params=None):
+        """GET a JSON resource, revalidating any cached copy with ETag/Last-Modified"""
+        # Key on the full resource (but never store the API key) so a 304 can't return another location's data
+        key = url
+        if params:
+            key += '?' + '&'.join(f"{k}={v}" for k, v in sorted(params.items()) if k != 'appid')
+        
+        cached = self._http_cache.get(key)
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        response = session.get(url, params=params, headers=headers, timeout=self.http_timeout)
+        if response.status_code == 304 and cached:
+            logger.info(f"Resource not modified, using cached response for: {url}")
+            return cached['body']
+        
+        response.raise_for_status()
+        body = response.json()
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._http_cache_lock:
+                self._http_cache[key] = {'etag': etag, 'last_modified': last_modified, 'body': body}
+                self.write_json_file(self._http_cache_path, self._http_cache)
+        return body
+
+    def read_json_file(self, path):
+        """Read a JSON cache file, returning None if it is missing or unreadable"""
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_json_file(self, path, data):
+        """Atomically write a JSON cache file"""
+        try:
+            # Write to a temporary file and rename so a crash never leaves a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache file {path}: {e}")
+
     def estimate_solar_generation(self, forecast):
-        """Estimate potential solar generation based on weather forecast"""
+        """Estimate potential solar generation based on weather forecast columns"""
         if not forecast:
-            return []
+            return None
         
-        # Simple model: clear sky = good generation, cloudy = reduced generation
-        estimates = []
-        for entry in forecast:
-            dt = datetime.strptime(entry['datetime'], '%Y-%m-%d %H:%M:%S')
-            hour = dt.hour
-            
-            # Adjust for daylight hours (simplified)
-            daylight_factor = 0
-            if 6 <= hour < 20:  # Daylight hours approximation
-                # Peak sun hours are typically around noon
-                daylight_factor = 1.0 - (abs(hour - 13) / 7)
+        # Clear-sky model: sun position scaled by the Kasten-Czeplak cloud attenuation
+        lat = self.cfg.location_lat
+        lon = self.cfg.location_lon
+        pv_peak_kw = self.cfg.pv_peak_kw
+        estimated_kwh = array('d')
+        for dt, clouds in zip(forecast['dt'], forecast['clouds']):
+            # Adjust for the sun's height in the sky at this location and time
+            daylight_factor = solar_elevation_factor(lat, lon, dt)
             
-            # Adjust for cloud coverage
-            cloud_factor = 1.0 - (entry['clouds'] / 100.0)
+            # Adjust for cloud coverage (thin cloud barely reduces output, overcast reduces it by 75%)
+            cloud_factor = 1.0 - 0.75 * (clouds / 100.0) ** 3.4
             
-            # Estimated kWh for this 3-hour period
-            # This would need calibration based on your system's capacity
-            estimated_kwh = daylight_factor * cloud_factor * 3.0  # Assuming 3kWh maximum per hour
-            
-            estimates.append({
-                'datetime': entry['datetime'],
-                'estimated_kwh': max(0, estimated_kwh),
-                'clouds': entry['clouds'],
-                'weather': entry['weather']
-            })
+            # Estimated kWh for this 3-hour period: output power (kW) over the slot length
+            estimated_kwh.append(max(0.0, daylight_factor * cloud_factor * pv_peak_kw * FORECAST_SLOT_HOURS))
         
-        return estimates
+        return {
+            'dt': forecast['dt'],
+            'estimated_kwh': estimated_kwh,
+            'clouds': forecast['clouds'],
+            'weather': forecast['weather']
+        }
 
     def decide_charging_strategy(self):
         """Decide on the battery charging strategy based on forecasts"""
-        battery_status = self.get_battery_status()
+        # Battery status and weather come from independent hosts, so fetch them concurrently
+        battery_future = self._executor.submit(self.get_battery_status)
+        forecast_future = self._executor.submit(self.get_weather_forecast)
+        battery_status = battery_future.result()
+        forecast = forecast_future.result()
+        
         if not battery_status:
             logger.error("Cannot decide charging strategy without battery status")
             return
         
-        forecast = self.get_weather_forecast()
-        if not forecast:
+        if not forecast or not forecast['dt']:
             logger.error("Cannot decide charging strategy without weather forecast")
             return
         
         generation_estimates = self.estimate_solar_generation(forecast)
         
         # Calculate total estimated generation for tomorrow
-        total_estimated_generation = sum(e['estimated_kwh'] for e in generation_estimates)
+        total_estimated_generation = sum(generation_estimates['estimated_kwh'])
         logger.info(f"Estimated solar generation for next 24h: {total_estimated_generation:.2f} kWh")
         
         current_battery_level = battery_status['battery_level']
         
-        if total_estimated_generation < CHARGE_THRESHOLD and current_battery_level < MIN_BATTERY_LEVEL:
+        if total_estimated_generation < self.cfg.charge_threshold and current_battery_level < self.cfg.min_battery_level:
             logger.info(f"Low solar generation expected ({total_estimated_generation:.2f} kWh) and battery level is low ({current_battery_level}%). Scheduling overnight charge.")
             self.schedule_overnight_charge()
         else:
@@ -223,32 +510,20 @@ class GivEnergyWeatherOptimizer:
             # Get tomorrow's date in the format expected by the API
             tomorrow = (datetime.now(self.timezone) + timedelta(days=1)).strftime('%Y-%m-%d')
             
-            # Define charge window (typically during off-peak hours)
-            charge_start = "01:30:00"
-            charge_end = "05:30:00"
-            
-            # Based on API spec, we should use the preset API for timed-charge
-            url = f"{GIVENERGY_BASE_URL}/inverter/{self.inverter_serial}/presets/timed-charge"
-            logger.info(f"Scheduling charge with URL: {url}")
+            desired = ('on', CHARGE_START, CHARGE_END)
+            if desired == self._last_preset:
+                logger.info("Timed-charge preset unchanged, skipping update")
+                return True
             
-            # Prepare the payload according to the API spec format for timed-charge preset
-            payload = {
-                "enabled": True,
-                "slots": [
-                    {
-                        "start_time": charge_start[:5],  # HH:MM format
-                        "end_time": charge_end[:5],      # HH:MM format
-                        "percent_limit": 100             # Target battery percentage
-                    }
-                ]
-            }
+            logger.info(f"Scheduling charge with URL: {self._url_preset}")
             
-            logger.info(f"Scheduling charge with payload: {json.dumps(payload)}")
-            response = requests.post(url, headers=self.get_givenergy_headers(), json=payload)
+            logger.info("Scheduling charge with payload: %s", CHARGE_PAYLOAD_JSON)
+            response = self.session.post(self._url_preset, data=CHARGE_PAYLOAD_JSON, timeout=self.http_timeout)
             
             # Both 200 and 201 are success responses
             if response.status_code in [200, 201]:
-                logger.info(f"Successfully scheduled overnight charge from {charge_start} to {charge_end} for tomorrow")
+                logger.info(f"Successfully scheduled overnight charge from {CHARGE_START} to {CHARGE_END} for tomorrow")
+                self.save_last_preset(desired)
                 return True
             else:
                 logger.error(f"Error scheduling overnight charge: {response.status_code} - {response.text}")
@@ -265,29 +540,21 @@ class GivEnergyWeatherOptimizer:
             return False
             
         try:
-            # Based on API spec, we should use the preset API for timed-charge with enabled=false
-            url = f"{GIVENERGY_BASE_URL}/inverter/{self.inverter_serial}/presets/timed-charge"
-            logger.info(f"Cancelling charge with URL: {url}")
+            desired = ('off',)
+            if desired == self._last_preset:
+                logger.info("Timed-charge preset unchanged, skipping update")
+                return True
             
-            # Prepare the payload to disable timed charging
-            # Note: API requires at least one slot, even when disabled
-            payload = {
-                "enabled": False,
-                "slots": [
-                    {
-                        "start_time": "00:00",
-                        "end_time": "00:00",
-                        "percent_limit": 100
-                    }
-                ]
-            }
+            # Timed-charge preset with enabled=false
+            logger.info(f"Cancelling charge with URL: {self._url_preset}")
             
-            logger.info(f"Cancelling charge with payload: {json.dumps(payload)}")
-            response = requests.post(url, headers=self.get_givenergy_headers(), json=payload)
+            logger.info("Cancelling charge with payload: %s", CANCEL_PAYLOAD_JSON)
+            response = self.session.post(self._url_preset, data=CANCEL_PAYLOAD_JSON, timeout=self.http_timeout)
             
             # Both 200 and 201 are success responses
             if response.status_code in [200, 201]:
                 logger.info(f"Successfully cancelled overnight charge for tomorrow")
+                self.save_last_preset(desired)
                 return True
             else:
                 logger.error(f"Error cancelling overnight charge: {response.status_code} - {response.text}")
@@ -302,6 +569,14 @@ class GivEnergyWeatherOptimizer:
         logger.info("Running daily battery optimization check")
         self.decide_charging_strategy()
 
+    def get_next_run_time(self, now):
+        """Get the next time the daily check is due after now"""
+        # Wall-clock arithmetic on a ZoneInfo datetime keeps 17:00 local across DST changes
+        next_run = now.replace(hour=DAILY_CHECK_HOUR, minute=DAILY_CHECK_MINUTE, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return next_run
+
     def start(self):
         """Start the optimizer service with scheduled runs"""
         logger.info("Starting GivEnergy Weather Optimizer service")
@@ -309,14 +584,24 @@ class GivEnergyWeatherOptimizer:
         # Run immediately on startup
         self.run_daily_check()
         
-        # Schedule daily runs
-        schedule.every().day.at("17:00").do(self.run_daily_check)  # Check in the late afternoon
+        # Sleep until the next daily check (in the late afternoon) rather than polling
+        next_run = self.get_next_run_time(datetime.now(self.timezone))
+        logger.info(f"Next daily check scheduled for {next_run.strftime('%Y-%m-%d %H:%M %Z')}")
         
         # Main loop
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute for scheduled tasks
-
+        try:
+            while True:
+                remaining = next_run.timestamp() - time.time()  # Absolute time, unaffected by DST
+                if remaining > 0:
+                    # Sleep in capped chunks so a clock jump is picked up on the next wake-up
+                    time.sleep(min(remaining, MAX_SLEEP_SECONDS))
+                    continue
+                
+                self.run_daily_check()
+                next_run = self.get_next_run_time(datetime.now(self.timezone))
+                logger.info(f"Next daily check scheduled for {next_run.strftime('%Y-%m-%d %H:%M %Z')}")
+        except KeyboardInterrupt:
+            logger.info("Stopping GivEnergy Weather Optimizer service")
 
 if __name__ == "__main__":
     try: